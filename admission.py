@@ -0,0 +1,219 @@
+import os
+import hmac
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from database import DB_POOL_SIZE, DB_MAX_OVERFLOW
+
+logger = logging.getLogger(__name__)
+
+# Route classes and their defaults: concurrent requests, max waiting requests,
+# seconds a request may wait for a slot, per-client rate (req/s) and burst.
+# A rate of 0 disables per-client rate limiting for the class.
+# Each admitted request holds at most one pool connection, so the concurrencies
+# (16 in total) fit the default pool of 20 with room for GET /api/about in batches
+# and the SSE token check.
+ROUTE_CLASS_DEFAULTS = {
+    "public_read": {"concurrency": 8, "queue": 100, "queue_timeout": 2.0, "rate": 0.0, "burst": 0},
+    "checkout": {"concurrency": 3, "queue": 50, "queue_timeout": 5.0, "rate": 2.0, "burst": 5},
+    "public_write": {"concurrency": 1, "queue": 10, "queue_timeout": 2.0, "rate": 0.1, "burst": 3},
+    "admin": {"concurrency": 2, "queue": 20, "queue_timeout": 5.0, "rate": 5.0, "burst": 10},
+    "auth": {"concurrency": 2, "queue": 20, "queue_timeout": 3.0, "rate": 0.5, "burst": 5},
+}
+
+# POST endpoints that only read, so they are admitted as public reads
+READ_ONLY_POST_PATHS = {"/api/batch", "/api/admin/events/ticket"}
+# GET endpoints that only admins use
+ADMIN_READ_PREFIXES = ("/api/orders", "/api/contact", "/api/dashboard", "/api/admission", "/api/admin")
+
+# Least recently seen clients are evicted past this many per route class
+MAX_TRACKED_CLIENTS = 10000
+
+# Proxies whose X-Forwarded-For is trusted, comma separated. Empty means use the peer address.
+TRUSTED_PROXIES = {ip.strip() for ip in os.getenv("TRUSTED_PROXIES", "").split(",") if ip.strip()}
+# Clients that skip per-client rate limits (still subject to concurrency limits), e.g. the
+# SSR server: by address, or by sending RATE_LIMIT_BYPASS_TOKEN in RATE_LIMIT_BYPASS_HEADER.
+RATE_LIMIT_EXEMPT_CLIENTS = {ip.strip() for ip in os.getenv("RATE_LIMIT_EXEMPT_CLIENTS", "").split(",") if ip.strip()}
+RATE_LIMIT_BYPASS_TOKEN = os.getenv("RATE_LIMIT_BYPASS_TOKEN", "")
+RATE_LIMIT_BYPASS_HEADER = "X-RateLimit-Bypass"
+
+
+def _setting(route_class, key, default):
+    value = os.getenv(f"ADMISSION_{route_class.upper()}_{key.upper()}")
+    if value is None:
+        return default
+    return type(default)(value)
+
+
+def classify(request: Request) -> str:
+    path = request.url.path.rstrip("/")
+    if path.startswith("/api/auth"):
+        return "auth"
+    if request.method in ("GET", "HEAD") or path in READ_ONLY_POST_PATHS:
+        return "admin" if path.startswith(ADMIN_READ_PREFIXES) else "public_read"
+    if path == "/api/orders":
+        return "checkout"
+    if path == "/api/contact":
+        return "public_write"
+    # Every other write endpoint requires an admin token
+    return "admin"
+
+
+def client_key(request: Request) -> str:
+    peer = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded or peer not in TRUSTED_PROXIES:
+        return peer
+    # Walk back through trusted proxies to the first address we did not add ourselves
+    hops = [ip.strip() for ip in forwarded.split(",") if ip.strip()]
+    for ip in reversed(hops):
+        if ip not in TRUSTED_PROXIES:
+            return ip
+    return peer
+
+
+def is_rate_limit_exempt(request: Request, client: str) -> bool:
+    if client in RATE_LIMIT_EXEMPT_CLIENTS:
+        return True
+    token = request.headers.get(RATE_LIMIT_BYPASS_HEADER)
+    return bool(RATE_LIMIT_BYPASS_TOKEN and token and hmac.compare_digest(token, RATE_LIMIT_BYPASS_TOKEN))
+
+
+class TokenBucket:
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Take a token; returns 0 on success, otherwise seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0
+        return (1 - self.tokens) / self.rate
+
+
+class RouteClassLimiter:
+    def __init__(self, name, concurrency, queue, queue_timeout, rate, burst):
+        self.name = name
+        self.concurrency = concurrency
+        self.max_queue = queue
+        self.queue_timeout = queue_timeout
+        self.rate = rate
+        self.burst = burst
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.buckets = OrderedDict()
+        self.in_flight = 0
+        self.queued = 0
+        self.admitted = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self.rate_limited = 0
+
+    def check_rate(self, client):
+        if self.rate <= 0:
+            return 0
+        bucket = self.buckets.get(client)
+        if bucket is None:
+            if len(self.buckets) >= MAX_TRACKED_CLIENTS:
+                self.buckets.popitem(last=False)
+            bucket = self.buckets[client] = TokenBucket(self.rate, self.burst)
+        else:
+            self.buckets.move_to_end(client)
+        return bucket.take()
+
+    def stats(self):
+        return {
+            "concurrency": self.concurrency,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "admitted": self.admitted,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "rate_limited": self.rate_limited,
+        }
+
+
+limiters = {
+    name: RouteClassLimiter(name, **{key: _setting(name, key, value) for key, value in defaults.items()})
+    for name, defaults in ROUTE_CLASS_DEFAULTS.items()
+}
+
+if sum(limiter.concurrency for limiter in limiters.values()) > DB_POOL_SIZE + DB_MAX_OVERFLOW:
+    logger.warning(
+        "Admission concurrency limits exceed the database pool (%d + %d); admitted requests may wait on the pool",
+        DB_POOL_SIZE,
+        DB_MAX_OVERFLOW,
+    )
+
+
+def _reject(status_code, detail, retry_after):
+    return JSONResponse(
+        status_code=status_code,
+        content={"detail": detail},
+        headers={"Retry-After": str(max(1, int(retry_after + 0.999)))},
+    )
+
+
+async def admission_control(request: Request, call_next):
+    """Limit concurrency per route class and shed load instead of queueing forever."""
+    if request.method == "OPTIONS":
+        return await call_next(request)
+
+    limiter = limiters[classify(request)]
+
+    client = client_key(request)
+    retry_after = 0 if is_rate_limit_exempt(request, client) else limiter.check_rate(client)
+    if retry_after:
+        limiter.rate_limited += 1
+        return _reject(429, "Too many requests", retry_after)
+
+    if limiter.semaphore.locked() and limiter.queued >= limiter.max_queue:
+        limiter.shed_queue_full += 1
+        return _reject(503, "Server busy, please retry", limiter.queue_timeout)
+
+    limiter.queued += 1
+    try:
+        await asyncio.wait_for(limiter.semaphore.acquire(), timeout=limiter.queue_timeout)
+    except asyncio.TimeoutError:
+        limiter.shed_timeout += 1
+        return _reject(503, "Server busy, please retry", limiter.queue_timeout)
+    finally:
+        limiter.queued -= 1
+
+    limiter.admitted += 1
+    limiter.in_flight += 1
+    try:
+        return await call_next(request)
+    finally:
+        limiter.in_flight -= 1
+        limiter.semaphore.release()
+
+
+async def borrow_slots(route_class, wanted):
+    """Take up to `wanted` extra slots for an admitted request without waiting."""
+    limiter = limiters[route_class]
+    taken = 0
+    while taken < wanted and not limiter.semaphore.locked():
+        await limiter.semaphore.acquire()
+        taken += 1
+    limiter.in_flight += taken
+    return taken
+
+
+def release_slots(route_class, count):
+    limiter = limiters[route_class]
+    limiter.in_flight -= count
+    for _ in range(count):
+        limiter.semaphore.release()
+
+
+def admission_stats():
+    return {name: limiter.stats() for name, limiter in limiters.items()}
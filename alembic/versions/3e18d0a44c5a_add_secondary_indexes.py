@@ -0,0 +1,45 @@
+"""add secondary indexes
+
+Revision ID: 3e18d0a44c5a
+Revises:
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e18d0a44c5a'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tables were originally created with metadata.create_all, so new databases may
+# already have these indexes; every operation is guarded with if_(not_)exists.
+
+
+def upgrade() -> None:
+    op.create_index('ix_products_category_id', 'products', ['category_id'], if_not_exists=True)
+    op.create_index('ix_order_items_order_id', 'order_items', ['order_id'], if_not_exists=True)
+    op.create_index('ix_order_items_product_id', 'order_items', ['product_id'], if_not_exists=True)
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], if_not_exists=True)
+    op.create_index('ix_projects_created_at', 'projects', ['created_at'], if_not_exists=True)
+    op.create_index('ix_contact_submissions_created_at', 'contact_submissions', ['created_at'], if_not_exists=True)
+
+    op.drop_index('ix_about_us_title', table_name='about_us', if_exists=True)
+    op.drop_index('ix_projects_title', table_name='projects', if_exists=True)
+
+
+def downgrade() -> None:
+    op.create_index('ix_projects_title', 'projects', ['title'], if_not_exists=True)
+    op.create_index('ix_about_us_title', 'about_us', ['title'], if_not_exists=True)
+
+    op.drop_index('ix_contact_submissions_created_at', table_name='contact_submissions', if_exists=True)
+    op.drop_index('ix_projects_created_at', table_name='projects', if_exists=True)
+    op.drop_index('ix_orders_created_at', table_name='orders', if_exists=True)
+    op.drop_index('ix_order_items_product_id', table_name='order_items', if_exists=True)
+    op.drop_index('ix_order_items_order_id', table_name='order_items', if_exists=True)
+    op.drop_index('ix_products_category_id', table_name='products', if_exists=True)
@@ -15,6 +15,10 @@ import hashlib
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-at-least-32-chars-long")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+# Tickets for the admin SSE feed travel in the URL, so they are short-lived and only
+# valid for that stream (never as a bearer token)
+STREAM_TICKET_SCOPE = "admin_events"
+STREAM_TICKET_EXPIRE_SECONDS = 60
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
@@ -38,7 +42,13 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+def create_stream_ticket(email: str):
+    return create_access_token(
+        data={"sub": email, "scope": STREAM_TICKET_SCOPE},
+        expires_delta=timedelta(seconds=STREAM_TICKET_EXPIRE_SECONDS),
+    )
+
+def get_user_from_token(token: str, db: Session, scope: Optional[str] = None):
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -47,7 +57,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
-        if email is None:
+        # Access tokens carry no scope; scoped tickets are only accepted where requested
+        if email is None or payload.get("scope") != scope:
             raise credentials_exception
     except JWTError:
         raise credentials_exception
@@ -56,3 +67,6 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = De
     if user is None:
         raise credentials_exception
     return user
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+    return get_user_from_token(token, db)
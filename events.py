@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import select
+import asyncio
+import uuid
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+import models
+from sqlalchemy.engine import make_url
+from database import engine, SQLALCHEMY_DATABASE_URL
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_CHANNEL = "admin_events"
+# Events kept in memory so reconnecting clients can resume from Last-Event-ID
+EVENT_HISTORY_SIZE = int(os.getenv("EVENT_HISTORY_SIZE", "1000"))
+# Events buffered per connected client before it is disconnected to resume later
+SUBSCRIBER_QUEUE_SIZE = 500
+SSE_KEEPALIVE_SECONDS = 15
+
+USE_PG_NOTIFY = engine.dialect.name == "postgresql"
+# LISTEN needs a session-level connection, which transaction-mode poolers such as
+# PgBouncer (Neon's "-pooler" hosts) do not keep; use a direct connection string here
+DATABASE_LISTEN_URL = os.getenv("DATABASE_LISTEN_URL") or SQLALCHEMY_DATABASE_URL
+
+
+class Subscription:
+    def __init__(self, loop, backlog, reset):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.backlog = backlog
+        self.reset = reset
+        self.reset_id = None
+
+    def offer(self, item):
+        # Runs on the subscriber's event loop
+        if self.queue.full():
+            # Too slow: drop buffered events and close so the client resumes from history
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+        else:
+            self.queue.put_nowait(item)
+
+
+class Broadcaster:
+    """Fans events out to every connected admin from one source per process.
+
+    Event ids are "<epoch>-<seq>". The epoch is random per process and changes whenever
+    events may have been missed, so an id from another worker, an earlier run or before
+    a listener gap never matches and the client is told to reset instead.
+    """
+
+    def __init__(self, history_size):
+        self.history = deque(maxlen=history_size)
+        self.epoch = uuid.uuid4().hex[:8]
+        self.last_seq = 0
+        self.subscribers = set()
+        self.lock = threading.Lock()
+        self.listener = None
+
+    def _event_id(self, seq):
+        return f"{self.epoch}-{seq}"
+
+    def publish(self, event_type, data):
+        """Thread-safe; called from request threads or the LISTEN thread."""
+        with self.lock:
+            self.last_seq += 1
+            item = {"seq": self.last_seq, "id": self._event_id(self.last_seq), "type": event_type, "data": data}
+            self.history.append(item)
+            subscribers = list(self.subscribers)
+        self._deliver(subscribers, item)
+
+    def reset(self):
+        """Forget history under a new epoch and tell connected clients to reload."""
+        with self.lock:
+            self.epoch = uuid.uuid4().hex[:8]
+            self.last_seq = 0
+            self.history.clear()
+            item = {"seq": 0, "id": self._event_id(0), "type": "reset", "data": {}}
+            subscribers = list(self.subscribers)
+        self._deliver(subscribers, item)
+
+    def _deliver(self, subscribers, item):
+        for subscription in subscribers:
+            subscription.loop.call_soon_threadsafe(subscription.offer, item)
+
+    def subscribe(self, last_event_id=None):
+        with self.lock:
+            reset = False
+            backlog = []
+            if last_event_id:
+                epoch, _, seq = last_event_id.partition("-")
+                oldest = self.history[0]["seq"] if self.history else self.last_seq + 1
+                reset = (
+                    epoch != self.epoch
+                    or not seq.isdigit()
+                    or int(seq) > self.last_seq
+                    or int(seq) < oldest - 1
+                )
+                if not reset:
+                    backlog = [item for item in self.history if item["seq"] > int(seq)]
+            subscription = Subscription(asyncio.get_running_loop(), backlog, reset)
+            subscription.reset_id = self._event_id(self.last_seq)
+            self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscribers.discard(subscription)
+
+    def start_listener(self):
+        """Start the single LISTEN thread for this process; called at app startup."""
+        with self.lock:
+            if self.listener is None or not self.listener.is_alive():
+                self.listener = threading.Thread(target=self._listen, name="admin-events-listener", daemon=True)
+                self.listener.start()
+
+    def _listen(self):
+        # One dedicated connection outside the pool, shared by all subscribers
+        listen_engine = create_engine(DATABASE_LISTEN_URL, poolclass=NullPool)
+        reconnecting = False
+        while True:
+            try:
+                connection = listen_engine.raw_connection()
+                try:
+                    dbapi_connection = connection.driver_connection
+                    dbapi_connection.autocommit = True
+                    cursor = dbapi_connection.cursor()
+                    cursor.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                    if reconnecting:
+                        # Anything NOTIFYed while we were disconnected is lost
+                        self.reset()
+                        reconnecting = False
+                    while True:
+                        if select.select([dbapi_connection], [], [], SSE_KEEPALIVE_SECONDS) == ([], [], []):
+                            continue
+                        dbapi_connection.poll()
+                        while dbapi_connection.notifies:
+                            notify = dbapi_connection.notifies.pop(0)
+                            payload = json.loads(notify.payload)
+                            self.publish(payload["type"], payload["data"])
+                finally:
+                    connection.close()
+            except Exception:
+                logger.exception("Admin event listener failed, reconnecting")
+                reconnecting = True
+                time.sleep(5)
+
+
+broadcaster = Broadcaster(EVENT_HISTORY_SIZE)
+
+
+def _looks_pooled(url):
+    url = make_url(url)
+    return "-pooler" in (url.host or "") or url.port == 6432
+
+
+def start_listener():
+    if not USE_PG_NOTIFY:
+        return
+    if _looks_pooled(DATABASE_LISTEN_URL):
+        logger.warning(
+            "Admin event listener is using a connection pooler (%s); LISTEN does not work through "
+            "transaction pooling and admins will receive no events. Set DATABASE_LISTEN_URL to a direct connection.",
+            make_url(DATABASE_LISTEN_URL).host,
+        )
+    broadcaster.start_listener()
+
+
+def _order_data(order):
+    return {
+        "id": order.id,
+        "customer_name": order.customer_name,
+        "customer_email": order.customer_email,
+        "total_amount": order.total_amount,
+        "status": order.status,
+    }
+
+
+def _contact_data(submission):
+    return {"id": submission.id, "name": submission.name, "email": submission.email}
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_events(session, flush_context):
+    events = []
+    for obj in session.new:
+        if isinstance(obj, models.Order):
+            events.append(("order_created", _order_data(obj)))
+        elif isinstance(obj, models.ContactSubmission):
+            events.append(("contact_submitted", _contact_data(obj)))
+    for obj in session.dirty:
+        if isinstance(obj, models.Order) and inspect(obj).attrs.status.history.has_changes():
+            events.append(("order_status_changed", _order_data(obj)))
+    if not events:
+        return
+
+    at = datetime.utcnow().isoformat()
+    for _, data in events:
+        data["at"] = at
+
+    if session.get_bind().dialect.name == "postgresql":
+        # NOTIFY is transactional: listeners only see it once the flush is committed
+        connection = session.connection()
+        for event_type, data in events:
+            connection.execute(
+                text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": NOTIFY_CHANNEL, "payload": json.dumps({"type": event_type, "data": data})},
+            )
+    else:
+        session.info.setdefault("pending_events", []).extend(events)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_events(session):
+    for event_type, data in session.info.pop("pending_events", []):
+        broadcaster.publish(event_type, data)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_events(session):
+    session.info.pop("pending_events", None)
+
+
+def format_sse(item):
+    return f"id: {item['id']}\nevent: {item['type']}\ndata: {json.dumps(item['data'])}\n\n"
+
+
+async def event_stream(request, last_event_id=None):
+    subscription = broadcaster.subscribe(last_event_id)
+    try:
+        if subscription.reset:
+            # Client should reload the full lists once, then keep listening
+            yield f"id: {subscription.reset_id}\nevent: reset\ndata: {{}}\n\n"
+        for item in subscription.backlog:
+            yield format_sse(item)
+        while not await request.is_disconnected():
+            try:
+                item = await asyncio.wait_for(subscription.queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            if item is None:
+                break
+            yield format_sse(item)
+    finally:
+        broadcaster.unsubscribe(subscription)
@@ -1,28 +1,64 @@
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from pydantic import ConfigDict, TypeAdapter, ValidationError, create_model
+from pydantic.fields import FieldInfo
 from sqlalchemy import func
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Annotated, List, Optional, get_type_hints
 import os
+import json
+import asyncio
+import inspect
+import logging
 import models, schemas, database
-from database import get_db, engine
+from database import get_db, get_read_db, open_read_session, pin_to_primary, engine, PRIMARY_PIN_UNTIL_HEADER
+from admission import admission_control, admission_stats, borrow_slots, release_slots, READ_ONLY_POST_PATHS
+from events import event_stream, start_listener
 
 # Initialize database tables
 models.Base.metadata.create_all(bind=engine)
 
 from fastapi.security import OAuth2PasswordRequestForm
-from auth import create_access_token, get_password_hash, verify_password, get_current_user, ACCESS_TOKEN_EXPIRE_MINUTES
+from auth import create_access_token, create_stream_ticket, get_password_hash, verify_password, get_current_user, get_user_from_token, ACCESS_TOKEN_EXPIRE_MINUTES, STREAM_TICKET_SCOPE, STREAM_TICKET_EXPIRE_SECONDS
 from datetime import timedelta
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="MyProfile API", description="MyProfile API", version="1.0.0")
 
-# Configure CORS
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Limits for the batch read endpoints
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "20"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+@app.middleware("http")
+async def read_your_writes(request: Request, call_next):
+    response = await call_next(request)
+    if (
+        request.method in WRITE_METHODS
+        and request.url.path not in READ_ONLY_POST_PATHS
+        and response.status_code < 400
+    ):
+        pin_to_primary(response)
+    return response
+
+# Sheds load before any other work; only CORS wraps it so rejections stay readable by browsers
+app.middleware("http")(admission_control)
+
+# Configure CORS (added last so it is the outermost middleware)
+# Credentialed requests (the read-your-writes cookie) need explicit origins, not "*".
+# FRONTEND_URL is a comma separated list of every frontend (storefront, admin, local dev).
+FRONTEND_ORIGINS = [url.strip().rstrip("/") for url in os.getenv("FRONTEND_URL", "").split(",") if url.strip()]
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],  # Allow all origins for development
+    allow_origins=FRONTEND_ORIGINS or ["*"],  # Allow all origins for development
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PRIMARY_PIN_UNTIL_HEADER, "Retry-After"],
 )
 
 # Auth Routes
@@ -47,7 +83,7 @@ def read_users_me(current_user: models.User = Depends(get_current_user)):
 
 # Category Routes
 @app.get("/api/categories", response_model=List[schemas.Category])
-def get_categories(db: Session = Depends(get_db)):
+def get_categories(db: Session = Depends(get_read_db)):
     return db.query(models.Category).all()
 
 @app.post("/api/categories", response_model=schemas.Category)
@@ -60,14 +96,28 @@ def create_category(category: schemas.CategoryCreate, db: Session = Depends(get_
 
 # Product Routes
 @app.get("/api/products", response_model=List[schemas.Product])
-def get_products(category_id: Optional[int] = None, db: Session = Depends(get_db)):
+def get_products(category_id: Optional[int] = None, db: Session = Depends(get_read_db)):
     query = db.query(models.Product)
     if category_id:
         query = query.filter(models.Product.category_id == category_id)
     return query.all()
 
+@app.get("/api/products/batch", response_model=List[schemas.ProductLookup])
+def get_products_by_slugs(slug: Annotated[List[str], Query()], db: Session = Depends(get_read_db)):
+    slugs = list(dict.fromkeys(slug))
+    if len(slugs) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} slugs per request")
+    products = {
+        product.slug: product
+        for product in db.query(models.Product).filter(models.Product.slug.in_(slugs)).all()
+    }
+    return [
+        {"slug": s, "product": products.get(s), "error": None if s in products else "Product not found"}
+        for s in slugs
+    ]
+
 @app.get("/api/products/slug/{slug}", response_model=schemas.Product)
-def get_product_by_slug(slug: str, db: Session = Depends(get_db)):
+def get_product_by_slug(slug: str, db: Session = Depends(get_read_db)):
     product = db.query(models.Product).filter(models.Product.slug == slug).first()
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
@@ -107,16 +157,16 @@ def create_order(order: schemas.OrderCreate, db: Session = Depends(get_db)):
     return db_order
 
 @app.get("/api/orders", response_model=List[schemas.Order])
-def get_orders(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_orders(db: Session = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
     return db.query(models.Order).order_by(models.Order.created_at.desc()).all()
 
 # Page Routes
 @app.get("/api/pages", response_model=List[schemas.Page])
-def get_pages(db: Session = Depends(get_db)):
+def get_pages(db: Session = Depends(get_read_db)):
     return db.query(models.Page).all()
 
 @app.get("/api/pages/{slug}", response_model=schemas.Page)
-def get_page(slug: str, db: Session = Depends(get_db)):
+def get_page(slug: str, db: Session = Depends(get_read_db)):
     page = db.query(models.Page).filter(models.Page.slug == slug).first()
     if not page:
         raise HTTPException(status_code=404, detail="Page not found")
@@ -135,7 +185,7 @@ def update_page(page_id: int, page_update: schemas.PageCreate, db: Session = Dep
 
 # Dashboard Summary
 @app.get("/api/dashboard/stats")
-def get_dashboard_stats(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_dashboard_stats(db: Session = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
     product_count = db.query(models.Product).count()
     order_count = db.query(models.Order).count()
     category_count = db.query(models.Category).count()
@@ -147,6 +197,55 @@ def get_dashboard_stats(db: Session = Depends(get_db), current_user: models.User
         "revenue": total_revenue
     }
 
+@app.get("/api/admission/stats")
+def get_admission_stats(current_user: models.User = Depends(get_current_user)):
+    return admission_stats()
+
+# Live admin feed (Server-Sent Events)
+@app.on_event("startup")
+def start_admin_event_listener():
+    # One LISTEN connection per process, running before any admin subscribes
+    start_listener()
+
+def authenticate_token(token: str):
+    db = database.SessionLocal()
+    try:
+        return get_user_from_token(token, db)
+    finally:
+        db.close()
+
+def authenticate_stream_ticket(ticket: Optional[str]):
+    db = database.SessionLocal()
+    try:
+        return get_user_from_token(ticket or "", db, scope=STREAM_TICKET_SCOPE)
+    finally:
+        db.close()
+
+@app.post("/api/admin/events/ticket", response_model=schemas.StreamTicket)
+def create_admin_events_ticket(current_user: models.User = Depends(get_current_user)):
+    # EventSource cannot send an Authorization header, so it connects with this ticket
+    # instead of the access token; fetch a fresh one before each (re)connect
+    return {"ticket": create_stream_ticket(current_user.email), "expires_in": STREAM_TICKET_EXPIRE_SECONDS}
+
+@app.get("/api/admin/events")
+async def admin_events(
+    request: Request,
+    ticket: Optional[str] = None,
+    since: Optional[str] = None,
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID"),
+):
+    # The session is closed before streaming so the feed never holds a pool connection
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        await run_in_threadpool(authenticate_token, authorization[7:])
+    else:
+        await run_in_threadpool(authenticate_stream_ticket, ticket)
+    return StreamingResponse(
+        event_stream(request, last_event_id if last_event_id is not None else since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # Existing About Us Endpoints
 @app.get("/api/about", response_model=schemas.AboutUs)
 def get_about(db: Session = Depends(get_db)):
@@ -178,7 +277,7 @@ def update_about(about_update: schemas.AboutUsCreate, db: Session = Depends(get_
 
 # Project Endpoints
 @app.get("/api/projects", response_model=List[schemas.Project])
-def get_projects(db: Session = Depends(get_db)):
+def get_projects(db: Session = Depends(get_read_db)):
     return db.query(models.Project).order_by(models.Project.created_at.desc()).all()
 
 @app.post("/api/projects", response_model=schemas.Project)
@@ -199,5 +298,100 @@ def submit_contact(submission: schemas.ContactSubmissionCreate, db: Session = De
     return db_submission
 
 @app.get("/api/contact", response_model=List[schemas.ContactSubmission])
-def get_contacts(db: Session = Depends(get_db), current_user: models.User = Depends(get_current_user)):
+def get_contacts(db: Session = Depends(get_read_db), current_user: models.User = Depends(get_current_user)):
     return db.query(models.ContactSubmission).order_by(models.ContactSubmission.created_at.desc()).all()
+
+# Batch Endpoints
+# resource name -> (handler, response type)
+BATCH_RESOURCES = {
+    "about": (get_about, schemas.AboutUs),
+    "categories": (get_categories, List[schemas.Category]),
+    "products": (get_products, List[schemas.Product]),
+    "product": (get_product_by_slug, schemas.Product),
+    "products_by_slug": (get_products_by_slugs, List[schemas.ProductLookup]),
+    "pages": (get_pages, List[schemas.Page]),
+    "page": (get_page, schemas.Page),
+    "projects": (get_projects, List[schemas.Project]),
+}
+
+def batch_params_model(resource: str, handler):
+    """Pydantic model for a handler's query/path parameters, used to validate batch params."""
+    hints = get_type_hints(handler)
+    fields = {}
+    for name, param in inspect.signature(handler).parameters.items():
+        if name == "db":
+            continue
+        default = param.default
+        if default is inspect.Parameter.empty or isinstance(default, FieldInfo):
+            default = ...
+        fields[name] = (hints[name], default)
+    return create_model(f"{resource}_params", __config__=ConfigDict(extra="forbid"), **fields)
+
+BATCH_PARAMS = {resource: batch_params_model(resource, handler) for resource, (handler, _) in BATCH_RESOURCES.items()}
+BATCH_RESPONSE_ADAPTERS = {resource: TypeAdapter(response_type) for resource, (_, response_type) in BATCH_RESOURCES.items()}
+
+def validate_batch_item(item: schemas.BatchRequestItem):
+    """Returns (dedup key, validated params, error); equivalent params share a key."""
+    if item.resource not in BATCH_RESOURCES:
+        return ("unknown", item.resource), None, (404, None, f"Unknown resource: {item.resource}")
+    try:
+        params = BATCH_PARAMS[item.resource].model_validate(item.params).model_dump()
+    except ValidationError as exc:
+        raw = json.dumps(item.params, sort_keys=True, default=str)
+        return (item.resource, raw), None, (400, None, f"Invalid params: {exc.errors(include_url=False)}")
+    return (item.resource, json.dumps(params, sort_keys=True, default=str)), params, None
+
+def resolve_batch_item(request: Request, resource: str, params: dict):
+    handler, _ = BATCH_RESOURCES[resource]
+    # Each sub-request uses exactly one session; get_about may insert its default
+    # row, so it gets a writable primary session instead of a read session
+    db = database.SessionLocal() if handler is get_about else open_read_session(request)
+    try:
+        result = handler(db=db, **params)
+        adapter = BATCH_RESPONSE_ADAPTERS[resource]
+        return 200, adapter.dump_python(adapter.validate_python(result, from_attributes=True), mode="json"), None
+    except HTTPException as exc:
+        return exc.status_code, None, str(exc.detail)
+    except Exception:
+        logger.exception("Batch item %s failed", resource)
+        return 500, None, "Internal error"
+    finally:
+        db.close()
+
+@app.post("/api/batch", response_model=List[schemas.BatchResponseItem])
+async def batch_read(batch: schemas.BatchRequest, request: Request):
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_ITEMS} requests per batch")
+
+    # Identical sub-requests (after validation) are resolved once
+    keys = []
+    results = {}
+    pending = {}
+    for item in batch.requests:
+        key, params, error = validate_batch_item(item)
+        keys.append(key)
+        if error:
+            results[key] = error
+        elif key not in results:
+            pending[key] = (item.resource, params)
+
+    # Each concurrent sub-request holds one connection. Admission already counted one
+    # public_read slot for this request; borrow more (without waiting) for the fan-out.
+    extra = await borrow_slots("public_read", min(BATCH_CONCURRENCY, len(pending)) - 1)
+    try:
+        limit = asyncio.Semaphore(1 + extra)
+
+        async def resolve(resource, params):
+            async with limit:
+                return await run_in_threadpool(resolve_batch_item, request, resource, params)
+
+        resolved = await asyncio.gather(*(resolve(resource, params) for resource, params in pending.values()))
+        results.update(zip(pending, resolved))
+    finally:
+        release_slots("public_read", extra)
+
+    response = []
+    for item, key in zip(batch.requests, keys):
+        status_code, data, error = results[key]
+        response.append({"id": item.id, "resource": item.resource, "status": status_code, "data": data, "error": error})
+    return response
@@ -28,7 +28,7 @@ class Product(Base):
     description = Column(Text)
     price = Column(Integer) # In cents
     stock = Column(Integer, default=0)
-    category_id = Column(Integer)
+    category_id = Column(Integer, index=True)
     images = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
@@ -41,14 +41,14 @@ class Order(Base):
     customer_email = Column(String)
     total_amount = Column(Integer)
     status = Column(String, default="pending") # pending, processing, shipped, delivered, cancelled
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
 class OrderItem(Base):
     __tablename__ = "order_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer)
-    product_id = Column(Integer)
+    order_id = Column(Integer, index=True)
+    product_id = Column(Integer, index=True)
     quantity = Column(Integer)
     price = Column(Integer)
 
@@ -66,7 +66,7 @@ class AboutUs(Base):
     __tablename__ = "about_us"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
+    title = Column(String)
     description = Column(Text)
     mission = Column(Text, nullable=True)
     vision = Column(Text, nullable=True)
@@ -77,14 +77,14 @@ class Project(Base):
     __tablename__ = "projects"
 
     id = Column(Integer, primary_key=True, index=True)
-    title = Column(String, index=True)
+    title = Column(String)
     description = Column(Text)
     technologies = Column(String, nullable=True)
     images = Column(Text, nullable=True)
     project_url = Column(String, nullable=True)
     github_url = Column(String, nullable=True)
     featured = Column(Boolean, default=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
 
 class ContactSubmission(Base):
     __tablename__ = "contact_submissions"
@@ -93,4 +93,4 @@ class ContactSubmission(Base):
     name = Column(String)
     email = Column(String)
     message = Column(Text)
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
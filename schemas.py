@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 # Auth Schemas
@@ -7,6 +7,10 @@ class Token(BaseModel):
     access_token: str
     token_type: str
 
+class StreamTicket(BaseModel):
+    ticket: str
+    expires_in: int
+
 class TokenData(BaseModel):
     email: Optional[str] = None
 
@@ -64,6 +68,11 @@ class Product(ProductBase):
     class Config:
         from_attributes = True
 
+class ProductLookup(BaseModel):
+    slug: str
+    product: Optional[Product] = None
+    error: Optional[str] = None
+
 # Order Schemas
 class OrderItemBase(BaseModel):
     product_id: int
@@ -164,3 +173,19 @@ class ContactSubmission(ContactSubmissionBase):
 
     class Config:
         from_attributes = True
+
+# Batch Schemas
+class BatchRequestItem(BaseModel):
+    id: Optional[str] = None
+    resource: str
+    params: Dict[str, Any] = {}
+
+class BatchRequest(BaseModel):
+    requests: List[BatchRequestItem]
+
+class BatchResponseItem(BaseModel):
+    id: Optional[str] = None
+    resource: str
+    status: int
+    data: Optional[Any] = None
+    error: Optional[str] = None
@@ -0,0 +1,10 @@
+import os
+import sys
+import tempfile
+
+# Modules in this repo import each other as top-level modules (`import models`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The app binds its engine at import time, so point it at a throwaway database first.
+# Set TEST_DATABASE_URL to a disposable Postgres database to test against the production planner.
+os.environ["DATABASE_URL"] = os.getenv("TEST_DATABASE_URL") or "sqlite:///" + os.path.join(tempfile.mkdtemp(), "test.db")